@@ -8,6 +8,9 @@ Two-stage prediction system:
   + Temporal voting to stabilize empty vs idle
   + Publishes predictions to MQTT for the web dashboard
 
+The MQTT network thread only enqueues incoming samples; a worker thread
+updates the window, runs inference and publishes.
+
 Usage:
     python live_predict.py
     python live_predict.py --broker broker.hivemq.com --topic esp32/rssi/data
@@ -16,14 +19,22 @@ Usage:
 
 import argparse
 import json
+import queue
 import time
 import threading
+import traceback
 from collections import deque, Counter
 from datetime import datetime
 
 import numpy as np
 import paho.mqtt.client as mqtt
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib decoder
+    orjson = None
+
+from model.data_loader import RSSI_DTYPE, RSSI_MIN, RSSI_MAX
 from model.model import load_model
 from model.feature_extraction import extract_window_features
 
@@ -35,6 +46,24 @@ ACTIVITY_DISPLAY = {
 
 PREDICTION_TOPIC = "esp32/rssi/prediction"
 
+# An unchanged prediction is still re-sent this often (seconds), so a
+# dashboard that (re)connects while the room is static gets the state.
+REPUBLISH_INTERVAL = 5.0
+
+# Feature vectors equal to this many decimals reuse the previous model output.
+CACHE_DECIMALS = 2
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Prediction message with a fixed shape; only the values change, so it is
+# formatted directly instead of building and serialising a nested dict.
+PREDICTION_TEMPLATE = (
+    '{"prediction":"%s","confidence":%d,"features":{'
+    '"mean_rssi":%.1f,"std_rssi":%.2f,"min_rssi":%d,"max_rssi":%d,'
+    '"range_rssi":%d,"spike_count":%d,"spike_rate":"%.2f"}}'
+)
+
 
 class SpikeDetector:
     """
@@ -52,12 +81,25 @@ class SpikeDetector:
         self.spike_count = 0
 
     def check(self, rssi: int) -> bool:
-        if self.prev_rssi is not None:
-            if abs(rssi - self.prev_rssi) >= self.threshold:
-                self.remaining = self.holdoff
-                self.spike_count += 1
+        """Record a sample; True if it jumped from the previous one."""
+        spike = (
+            self.prev_rssi is not None
+            and abs(rssi - self.prev_rssi) >= self.threshold
+        )
+        if spike:
+            self.spike_count += 1
         self.prev_rssi = rssi
+        return spike
 
+    def hold(self, spike: bool) -> bool:
+        """
+        Advance one prediction cycle; True while the override is held.
+
+        spike says whether any sample since the previous prediction
+        jumped, so the holdoff counts predictions whatever the step size.
+        """
+        if spike:
+            self.remaining = self.holdoff
         if self.remaining > 0:
             self.remaining -= 1
             return True
@@ -88,15 +130,97 @@ class TemporalVoter:
         return winner
 
 
+class RingBuffer:
+    """
+    Fixed-size sample window backed by a preallocated NumPy array.
+
+    Every sample is written twice, at idx and idx + size, so the last
+    `size` samples are always one contiguous oldest-to-newest view and
+    appending never allocates.
+    """
+
+    def __init__(self, size: int, dtype=np.float64):
+        self.size = size
+        self.data = np.zeros(2 * size, dtype=dtype)
+        self.idx = 0
+        self.filled = 0
+
+    def append(self, value):
+        """Store a sample and return the one it overwrote (None while filling)."""
+        evicted = self.data[self.idx].item() if self.filled == self.size else None
+        self.data[self.idx] = value
+        self.data[self.idx + self.size] = value
+        self.idx = (self.idx + 1) % self.size
+        self.filled = min(self.filled + 1, self.size)
+        return evicted
+
+    def view(self) -> np.ndarray:
+        return self.data[self.idx:self.idx + self.size]
+
+
+class RollingStats:
+    """
+    Running mean, std, min and max over a sliding window of samples.
+
+    Keeps a running sum and sum of squares plus monotonic deques for the
+    extremes, so each new sample is O(1) regardless of window length.
+    RSSI values are integers, so the sums stay exact and never drift.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min_queue = deque()
+        self.max_queue = deque()
+
+    def push(self, value: int, evicted: int = None):
+        """Add a sample, removing the one that left the window (if any)."""
+        if evicted is None:
+            self.count += 1
+        else:
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+            if self.min_queue[0] == evicted:
+                self.min_queue.popleft()
+            if self.max_queue[0] == evicted:
+                self.max_queue.popleft()
+
+        self.total += value
+        self.total_sq += value * value
+
+        while self.min_queue and self.min_queue[-1] > value:
+            self.min_queue.pop()
+        self.min_queue.append(value)
+        while self.max_queue and self.max_queue[-1] < value:
+            self.max_queue.pop()
+        self.max_queue.append(value)
+
+    def snapshot(self) -> dict:
+        n = self.count
+        var = (n * self.total_sq - self.total * self.total) / (n * n)
+        return {
+            "mean": self.total / n,
+            "std": var ** 0.5,
+            "min": self.min_queue[0],
+            "max": self.max_queue[0],
+        }
+
+
 class LivePredictor:
-    """Real-time RSSI activity classifier with spike detection and temporal voting."""
+    """
+    Real-time RSSI activity classifier with spike detection and temporal voting.
+
+    Samples arrive through submit() and are processed on a worker thread
+    started with start(); add_sample() processes one sample synchronously.
+    """
 
     def __init__(
         self,
         model_dir: str,
         mqtt_client: mqtt.Client,
         window_size: int = 10,
-        step_size: int = 1,
+        step_size: int = 2,
         spike_threshold: float = 8.0,
         spike_holdoff: int = 3,
         vote_window: int = 5,
@@ -107,20 +231,34 @@ class LivePredictor:
         self.window_size = window_size
         self.step_size = step_size
 
-        self.rssi_buffer = deque(maxlen=window_size * 3)
-        self.time_buffer = deque(maxlen=window_size * 3)
+        self.rssi_buffer = RingBuffer(window_size, dtype=RSSI_DTYPE)
+        self.time_buffer = RingBuffer(window_size)
+        self.stats = RollingStats()
         self.samples_since_predict = 0
+        self.pending_spike = False
         self.prediction_count = 0
         self.total_samples = 0
         self.lock = threading.Lock()
+        self.queue = queue.SimpleQueue()
+        self.worker = threading.Thread(target=self._run, name="predictor", daemon=True)
 
         self.spike = SpikeDetector(spike_threshold, spike_holdoff)
         self.voter = TemporalVoter(vote_window)
 
         self.last_prediction = None
         self.last_confidence = None
+        self.last_payload = None
+        self.last_publish_time = 0.0
+        self.cache_key = None
+        self.cache_value = None
         self.start_time = time.time()
 
+        # Reused on every prediction instead of building a fresh row array.
+        self.feature_buf = np.empty(
+            (1, len(self.artifacts["feature_columns"])),
+            dtype=self.artifacts["feature_dtype"],
+        )
+
         print(f"Model loaded. Window: {window_size}, Step: {step_size}")
         print(f"Spike detector: threshold={spike_threshold} dBm, holdoff={spike_holdoff}")
         print(f"Temporal voter: window={vote_window} predictions")
@@ -128,44 +266,90 @@ class LivePredictor:
         print(f"Features: {len(self.artifacts['feature_columns'])}")
         print(f"Classes: {list(self.artifacts['label_encoder'].classes_)}")
 
+    def start(self):
+        self.worker.start()
+
+    def stop(self):
+        """Process any queued samples, then stop the worker thread."""
+        self.queue.put(None)
+        self.worker.join()
+
+    def submit(self, timestamp_ms: int, rssi: int):
+        """Queue a sample for the worker thread; safe to call from any thread."""
+        self.queue.put((timestamp_ms, rssi))
+
     def add_sample(self, timestamp_ms: int, rssi: int):
-        spike_active = self.spike.check(rssi)
+        self._ingest(timestamp_ms, rssi)
+        self._maybe_predict()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+
+            # Samples that piled up during the last inference are all
+            # added to the window, then predicted on once. A failure is
+            # logged and the worker carries on with the next batch.
+            try:
+                for item in batch:
+                    if item is not None:
+                        self._ingest(*item)
+                self._maybe_predict()
+            except Exception as e:
+                print(f"  [ERROR] Prediction failed: {type(e).__name__}: {e}")
+                traceback.print_exc()
+
+            if stop:
+                return
+
+    def _ingest(self, timestamp_ms: int, rssi: int):
+        # A Python int keeps RollingStats' sums exact; NumPy int8 values
+        # (e.g. a parse_file() rssi column) would wrap when squared.
+        rssi = int(rssi)
+        if not RSSI_MIN <= rssi <= RSSI_MAX:
+            print(f"  [WARN] Dropped out-of-range RSSI: {rssi}")
+            return
+        # Latched until the next prediction, so spikes on samples that do
+        # not trigger one (step_size > 1) still force the override.
+        self.pending_spike |= self.spike.check(rssi)
         self.total_samples += 1
 
         with self.lock:
-            self.rssi_buffer.append(rssi)
+            evicted = self.rssi_buffer.append(rssi)
             self.time_buffer.append(timestamp_ms / 1000.0)
+            self.stats.push(rssi, evicted)
             self.samples_since_predict += 1
 
-        if len(self.rssi_buffer) >= self.window_size and \
+    def _maybe_predict(self):
+        if self.rssi_buffer.filled >= self.window_size and \
            self.samples_since_predict >= self.step_size:
-            self._predict(spike_active)
+            self._predict()
             self.samples_since_predict = 0
 
-    def _predict(self, spike_active: bool = False):
+    def _predict(self):
         with self.lock:
-            rssi_arr = np.array(list(self.rssi_buffer))[-self.window_size:]
-            time_arr = np.array(list(self.time_buffer))[-self.window_size:]
+            rssi_arr = self.rssi_buffer.view()
+            time_arr = self.time_buffer.view()
             time_arr = time_arr - time_arr[0]
+            stats = self.stats.snapshot()
 
-        features = extract_window_features(rssi_arr, time_arr)
-
-        X = np.array([[features[col] for col in self.artifacts["feature_columns"]]])
-        X_scaled = self.artifacts["scaler"].transform(X)
-
-        prediction = self.artifacts["model"].predict(X_scaled)[0]
-        raw_label = self.artifacts["label_encoder"].inverse_transform([prediction])[0]
+        features = extract_window_features(rssi_arr, time_arr, stats)
 
-        probabilities = None
-        if hasattr(self.artifacts["model"], "predict_proba"):
-            proba = self.artifacts["model"].predict_proba(X_scaled)[0]
-            probabilities = dict(zip(
-                [str(c) for c in self.artifacts["label_encoder"].classes_],
-                [float(p) for p in proba],
-            ))
+        X = self.feature_buf
+        for i, col in enumerate(self.artifacts["feature_columns"]):
+            X[0, i] = features[col]
+        raw_label, probabilities = self._classify(X)
 
         override_reason = None
 
+        spike_active = self.spike.hold(self.pending_spike)
+        self.pending_spike = False
         if spike_active and raw_label != "moving":
             raw_label = "moving"
             override_reason = "spike"
@@ -186,40 +370,88 @@ class LivePredictor:
         elapsed = time.time() - self.start_time
         spike_rate = self.spike.spike_count / elapsed if elapsed > 0 else 0
 
-        self._publish(final_label, conf_pct, rssi_arr, features, spike_rate)
-        self._display(final_label, raw_label, probabilities, rssi_arr, override_reason)
+        published = self._publish(final_label, conf_pct, features, spike_rate)
+        self._display(final_label, raw_label, probabilities, features, override_reason, published)
+
+    def _classify(self, X: np.ndarray):
+        """
+        Run the model on one feature row, returning (label, probabilities).
+
+        A static room produces the same window features sample after
+        sample, so the result for the last rounded feature vector is
+        cached and the model is only called when the vector changes.
+        """
+        key = np.round(X, CACHE_DECIMALS).tobytes()
+        if key == self.cache_key:
+            return self.cache_value
+
+        model = self.artifacts["model"]
+        if self.artifacts["scaler"] is not None:
+            X = self.artifacts["scaler"].transform(X)
+
+        probabilities = None
+        if hasattr(model, "predict_proba"):
+            # predict() is the argmax of predict_proba(); one model call
+            # gives both the label and the confidences.
+            proba = model.predict_proba(X)[0]
+            classes = getattr(model, "classes_", np.arange(len(proba)))
+            prediction = classes[np.argmax(proba)]
+            probabilities = dict(zip(
+                [str(c) for c in self.artifacts["label_encoder"].classes_],
+                [float(p) for p in proba],
+            ))
+        else:
+            prediction = model.predict(X)[0]
+        raw_label = self.artifacts["label_encoder"].inverse_transform([prediction])[0]
+
+        self.cache_key = key
+        self.cache_value = (raw_label, probabilities)
+        return self.cache_value
 
     def _publish(
         self,
         label: str,
         confidence: int,
-        rssi_window: np.ndarray,
         features: dict,
         spike_rate: float,
-    ):
-        """Publish prediction to MQTT for the web dashboard."""
-        payload = {
-            "prediction": label.upper(),
-            "confidence": confidence,
-            "features": {
-                "mean_rssi": round(float(np.mean(rssi_window)), 1),
-                "std_rssi": round(float(np.std(rssi_window)), 2),
-                "min_rssi": int(np.min(rssi_window)),
-                "max_rssi": int(np.max(rssi_window)),
-                "range_rssi": int(np.ptp(rssi_window)),
-                "spike_count": self.spike.spike_count,
-                "spike_rate": f"{spike_rate:.2f}",
-            },
-        }
-        self.mqtt_client.publish(PREDICTION_TOPIC, json.dumps(payload))
+    ) -> bool:
+        """
+        Publish prediction to MQTT for the web dashboard.
+
+        Returns False without publishing when the message is identical to
+        the last one sent less than REPUBLISH_INTERVAL seconds ago, since
+        the dashboard state would not change.
+        """
+        message = PREDICTION_TEMPLATE % (
+            label.upper(),
+            confidence,
+            features["rssi_mean"],
+            features["rssi_std"],
+            features["rssi_min"],
+            features["rssi_max"],
+            features["rssi_range"],
+            self.spike.spike_count,
+            spike_rate,
+        )
+        now = time.monotonic()
+        if (
+            message == self.last_payload
+            and now - self.last_publish_time < REPUBLISH_INTERVAL
+        ):
+            return False
+        self.mqtt_client.publish(PREDICTION_TOPIC, message)
+        self.last_payload = message
+        self.last_publish_time = now
+        return True
 
     def _display(
         self,
         final_label: str,
         raw_label: str,
         probabilities: dict,
-        rssi_window: np.ndarray,
+        features: dict,
         override_reason: str,
+        published: bool = True,
     ):
         now = datetime.now().strftime("%H:%M:%S")
         display = ACTIVITY_DISPLAY.get(final_label, final_label)
@@ -233,8 +465,8 @@ class LivePredictor:
         elif override_reason == "vote":
             print(f"  🗳️  VOTED — model said '{raw_label}', majority says '{final_label}'")
 
-        print(f"  RSSI: mean={np.mean(rssi_window):.1f}  std={np.std(rssi_window):.1f}  "
-              f"range={np.ptp(rssi_window)}")
+        print(f"  RSSI: mean={features['rssi_mean']:.1f}  std={features['rssi_std']:.1f}  "
+              f"range={int(features['rssi_range'])}")
 
         if probabilities:
             print(f"  Confidence (model):")
@@ -250,7 +482,10 @@ class LivePredictor:
             summary = ", ".join(f"{k}:{v}" for k, v in counts.most_common())
             print(f"  Vote history [{len(vote_hist)}]: {summary}")
 
-        print(f"  → Published to {PREDICTION_TOPIC}")
+        if published:
+            print(f"  → Published to {PREDICTION_TOPIC}")
+        else:
+            print(f"  → Unchanged, not republished")
 
 
 def on_connect(client, userdata, flags, reason_code, properties):
@@ -265,10 +500,10 @@ def on_connect(client, userdata, flags, reason_code, properties):
 def on_message(client, userdata, msg):
     predictor = userdata["predictor"]
     try:
-        payload = json.loads(msg.payload.decode())
+        payload = _json_loads(msg.payload)
         timestamp_ms = int(payload.get("timestamp", 0))
         rssi = int(payload.get("rssi", -100))
-        predictor.add_sample(timestamp_ms, rssi)
+        predictor.submit(timestamp_ms, rssi)
     except (json.JSONDecodeError, KeyError, ValueError) as e:
         raw = msg.payload.decode().strip()
         parts = raw.split(",")
@@ -276,7 +511,7 @@ def on_message(client, userdata, msg):
             try:
                 timestamp_ms = int(parts[0])
                 rssi = int(parts[1])
-                predictor.add_sample(timestamp_ms, rssi)
+                predictor.submit(timestamp_ms, rssi)
                 return
             except ValueError:
                 pass
@@ -291,8 +526,9 @@ def parse_args():
     p.add_argument("--model-dir", default="model")
     p.add_argument("--window-size", type=int, default=10,
                    help="Samples per sliding window (default: 10)")
-    p.add_argument("--step-size", type=int, default=1,
-                   help="Samples between predictions (default: 1)")
+    p.add_argument("--step-size", type=int, default=2,
+                   help="Samples between predictions; matches the training "
+                        "window stride (default: 2)")
     p.add_argument("--spike-threshold", type=float, default=8.0,
                    help="RSSI dBm jump to trigger spike (default: 8.0)")
     p.add_argument("--spike-holdoff", type=int, default=3,
@@ -339,11 +575,20 @@ def main():
     print(f"\nConnecting to {args.broker}:{args.port}...")
     mqttc.connect(args.broker, args.port, keepalive=60)
 
+    predictor.start()
+    mqttc.loop_start()
     try:
-        mqttc.loop_forever()
+        while predictor.worker.is_alive():
+            time.sleep(1)
+        print("\n  [ERROR] Prediction worker stopped unexpectedly")
     except KeyboardInterrupt:
-        print(f"\n\nStopped. Total predictions: {predictor.prediction_count}")
-        mqttc.disconnect()
+        pass
+
+    mqttc.disconnect()
+    mqttc.loop_stop()
+    if predictor.worker.is_alive():
+        predictor.stop()
+    print(f"\n\nStopped. Total predictions: {predictor.prediction_count}")
 
 
 if __name__ == "__main__":
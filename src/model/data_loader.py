@@ -5,6 +5,7 @@ Parses Arduino Serial Monitor output with format:
     HH:MM:SS.mmm -> counter,RSSI
 """
 
+import json
 import os
 import re
 from pathlib import Path
@@ -17,6 +18,18 @@ LINE_PATTERN = re.compile(
     r"(\d{2}:\d{2}:\d{2}\.\d{3})\s*->\s*(-?\d+),\s*(-?\d+)"
 )
 
+# ESP32 reports RSSI as int8_t dBm; storing it that way keeps sample
+# buffers and DataFrames 8x smaller than the default int64.
+RSSI_DTYPE = np.int8
+RSSI_MIN = int(np.iinfo(RSSI_DTYPE).min)
+RSSI_MAX = int(np.iinfo(RSSI_DTYPE).max)
+
+# Compact on-disk dtypes for the parsed dataset cache.
+DATASET_DTYPES = {"counter": "int32", "rssi": RSSI_DTYPE, "label": "category"}
+
+# Same as LINE_PATTERN.match(line.strip()), for matching a whole column at once.
+ANCHORED_LINE_PATTERN = re.compile(r"^\s*" + LINE_PATTERN.pattern)
+
 LABEL_MAP = {
     "empty": "empty",
     "empty2": "empty",
@@ -34,41 +47,67 @@ LABEL_MAP = {
 }
 
 
-def _parse_timestamp(ts_str: str) -> float:
-    """Convert HH:MM:SS.mmm to seconds since midnight."""
-    h, m, rest = ts_str.split(":")
-    s, ms = rest.split(".")
-    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
+def _parse_timestamps(ts: pd.Series) -> pd.Series:
+    """Convert HH:MM:SS.mmm strings to seconds since midnight."""
+    h = ts.str.slice(0, 2).astype(np.int64)
+    m = ts.str.slice(3, 5).astype(np.int64)
+    s = ts.str.slice(6, 8).astype(np.int64)
+    ms = ts.str.slice(9, 12).astype(np.int64)
+    return h * 3600 + m * 60 + s + ms / 1000.0
 
 
 def parse_file(filepath: str) -> pd.DataFrame:
     """Parse a single ESP32 capture file into a DataFrame."""
-    rows = []
-    with open(filepath, "r") as f:
-        for line in f:
-            match = LINE_PATTERN.match(line.strip())
-            if match:
-                ts_str, counter, rssi = match.groups()
-                rows.append({
-                    "timestamp_str": ts_str,
-                    "time_sec": _parse_timestamp(ts_str),
-                    "counter": int(counter),
-                    "rssi": int(rssi),
-                })
-
-    df = pd.DataFrame(rows)
-    if not df.empty:
-        df["elapsed_sec"] = df["time_sec"] - df["time_sec"].iloc[0]
+    # Decode once for the whole file; serial noise bytes are dropped
+    # rather than aborting the parse.
+    with open(filepath, "rb") as f:
+        text = f.read().decode("utf-8", errors="ignore")
+    lines = pd.Series(text.splitlines())
+
+    # Regex runs over the whole column at once; non-matching lines drop out.
+    matches = lines.str.extract(ANCHORED_LINE_PATTERN).dropna()
+    if matches.empty:
+        return pd.DataFrame()
+
+    # Readings that do not fit RSSI_DTYPE are corrupt, not saturated.
+    rssi = matches[2].astype(np.int64)
+    in_range = rssi.between(RSSI_MIN, RSSI_MAX)
+    if not in_range.all():
+        print(f"  [WARN] Dropped {(~in_range).sum()} out-of-range RSSI rows "
+              f"in {Path(filepath).name}")
+        matches, rssi = matches[in_range], rssi[in_range]
+        if matches.empty:
+            return pd.DataFrame()
+
+    ts = matches[0].reset_index(drop=True)
+    df = pd.DataFrame({
+        "timestamp_str": ts,
+        "time_sec": _parse_timestamps(ts),
+        "counter": matches[1].astype(np.int64).to_numpy(),
+        "rssi": rssi.astype(RSSI_DTYPE).to_numpy(),
+    })
+    df["elapsed_sec"] = df["time_sec"] - df["time_sec"].iloc[0]
     return df
 
 
-def load_all_data(data_dir: str) -> pd.DataFrame:
+def load_all_data(data_dir: str, cache_path: str = None) -> pd.DataFrame:
     """
     Load all .txt capture files from a directory.
 
+    If cache_path is given, the parsed data is stored there as Parquet and
+    reused on later calls while the capture files (names, sizes, mtimes)
+    and LABEL_MAP match those recorded next to the cache.
+
     Returns a DataFrame with columns:
         [timestamp_str, time_sec, counter, rssi, elapsed_sec, file, label]
     """
+    if cache_path is not None:
+        manifest = _cache_manifest(data_dir)
+        if _cache_is_fresh(Path(cache_path), manifest):
+            combined = load_dataset(cache_path)
+            print(f"Loaded cached dataset {cache_path}: {len(combined)} samples")
+            return combined
+
     all_frames = []
 
     for filename in sorted(os.listdir(data_dir)):
@@ -98,9 +137,54 @@ def load_all_data(data_dir: str) -> pd.DataFrame:
     combined = pd.concat(all_frames, ignore_index=True)
     print(f"\nTotal samples loaded: {len(combined)}")
     print(f"Label distribution:\n{combined['label'].value_counts().to_string()}")
+
+    if cache_path is not None:
+        combined = save_dataset(combined, cache_path)
+        _manifest_path(Path(cache_path)).write_text(json.dumps(manifest))
     return combined
 
 
+def save_dataset(df: pd.DataFrame, path: str) -> pd.DataFrame:
+    """
+    Write a load_all_data() DataFrame to Parquet with compact dtypes.
+
+    Returns the DataFrame with those dtypes applied.
+    """
+    df = df.astype(DATASET_DTYPES)
+    df.to_parquet(path, compression="zstd", index=False)
+    print(f"Saved dataset cache to {path}")
+    return df
+
+
+def load_dataset(path: str) -> pd.DataFrame:
+    """Read a dataset written by save_dataset()."""
+    return pd.read_parquet(path)
+
+
+def _manifest_path(cache_path: Path) -> Path:
+    return cache_path.with_name(cache_path.name + ".json")
+
+
+def _cache_manifest(data_dir: str) -> dict:
+    """Describe the inputs a cached dataset was built from."""
+    files = {}
+    for filename in sorted(os.listdir(data_dir)):
+        if filename.endswith(".txt"):
+            st = os.stat(os.path.join(data_dir, filename))
+            files[filename] = [st.st_size, st.st_mtime_ns]
+    return {"files": files, "label_map": LABEL_MAP}
+
+
+def _cache_is_fresh(cache_path: Path, manifest: dict) -> bool:
+    manifest_path = _manifest_path(cache_path)
+    if not cache_path.exists() or not manifest_path.exists():
+        return False
+    try:
+        return json.loads(manifest_path.read_text()) == manifest
+    except ValueError:
+        return False
+
+
 def get_file_groups(df: pd.DataFrame) -> dict:
     """Group data by source file for per-session processing."""
     return {name: group.reset_index(drop=True) for name, group in df.groupby("file")}
@@ -7,9 +7,20 @@ to create feature vectors suitable for machine learning classifiers.
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # JIT kernel is optional
+    HAS_NUMBA = False
 
-def extract_window_features(rssi_values: np.ndarray, elapsed: np.ndarray) -> dict:
+
+def extract_window_features(
+    rssi_values: np.ndarray,
+    elapsed: np.ndarray,
+    stats: dict = None,
+) -> dict:
     """
     Extract features from a single window of RSSI samples.
 
@@ -17,6 +28,9 @@ def extract_window_features(rssi_values: np.ndarray, elapsed: np.ndarray) -> dic
     ----------
     rssi_values : array of RSSI (dBm) values in the window
     elapsed : array of elapsed time (seconds) for each sample
+    stats : optional precomputed window mean, std, min and max
+        (keys 'mean', 'std', 'min', 'max'), e.g. from a running
+        accumulator; computed from rssi_values when omitted
 
     Returns
     -------
@@ -26,32 +40,50 @@ def extract_window_features(rssi_values: np.ndarray, elapsed: np.ndarray) -> dic
     if n == 0:
         return {}
 
+    # RSSI is stored as int8; squares and differences need a wider type.
+    rssi_values = np.asarray(rssi_values, dtype=np.float64)
+
     dt = np.diff(elapsed)
     d_rssi = np.diff(rssi_values)
 
     rates = d_rssi / np.where(dt > 0, dt, 1e-6)
 
+    # One pass for the moments; every derived feature reuses them.
+    if stats is None:
+        mean = np.mean(rssi_values)
+        centered = rssi_values - mean
+        std = np.sqrt(np.mean(centered ** 2))
+        rssi_min = np.min(rssi_values)
+        rssi_max = np.max(rssi_values)
+    else:
+        mean = stats["mean"]
+        centered = rssi_values - mean
+        std = stats["std"]
+        rssi_min = stats["min"]
+        rssi_max = stats["max"]
+    q25, median, q75 = np.percentile(rssi_values, [25, 50, 75])
+
     features = {
-        "rssi_mean": np.mean(rssi_values),
-        "rssi_std": np.std(rssi_values),
-        "rssi_min": np.min(rssi_values),
-        "rssi_max": np.max(rssi_values),
-        "rssi_range": np.ptp(rssi_values),
-        "rssi_median": np.median(rssi_values),
-        "rssi_iqr": np.percentile(rssi_values, 75) - np.percentile(rssi_values, 25),
-        "rssi_skewness": _safe_skewness(rssi_values),
-        "rssi_kurtosis": _safe_kurtosis(rssi_values),
+        "rssi_mean": mean,
+        "rssi_std": std,
+        "rssi_min": rssi_min,
+        "rssi_max": rssi_max,
+        "rssi_range": rssi_max - rssi_min,
+        "rssi_median": median,
+        "rssi_iqr": q75 - q25,
+        "rssi_skewness": _safe_skewness(centered, std),
+        "rssi_kurtosis": _safe_kurtosis(centered, std),
         "rssi_mean_abs_diff": np.mean(np.abs(d_rssi)) if len(d_rssi) > 0 else 0,
         "rssi_rate_mean": np.mean(rates) if len(rates) > 0 else 0,
         "rssi_rate_std": np.std(rates) if len(rates) > 0 else 0,
         "rssi_rate_max": np.max(np.abs(rates)) if len(rates) > 0 else 0,
         "rssi_energy": np.sum(rssi_values ** 2) / n,
-        "rssi_zero_crossing_rate": _zero_crossing_rate(rssi_values - np.mean(rssi_values)),
+        "rssi_zero_crossing_rate": _zero_crossing_rate(centered),
         "n_samples": n,
     }
 
     if n >= 4:
-        fft_vals = np.abs(np.fft.rfft(rssi_values - np.mean(rssi_values)))
+        fft_vals = np.abs(np.fft.rfft(centered))
         features["fft_peak"] = np.max(fft_vals[1:]) if len(fft_vals) > 1 else 0
         features["fft_energy"] = np.sum(fft_vals[1:] ** 2) if len(fft_vals) > 1 else 0
         features["fft_entropy"] = _spectral_entropy(fft_vals[1:]) if len(fft_vals) > 1 else 0
@@ -63,26 +95,16 @@ def extract_window_features(rssi_values: np.ndarray, elapsed: np.ndarray) -> dic
     return features
 
 
-def _safe_skewness(x: np.ndarray) -> float:
-    n = len(x)
-    if n < 3:
-        return 0.0
-    mean = np.mean(x)
-    std = np.std(x)
-    if std == 0:
+def _safe_skewness(centered: np.ndarray, std: float) -> float:
+    if len(centered) < 3 or std == 0:
         return 0.0
-    return np.mean(((x - mean) / std) ** 3)
+    return np.mean((centered / std) ** 3)
 
 
-def _safe_kurtosis(x: np.ndarray) -> float:
-    n = len(x)
-    if n < 4:
-        return 0.0
-    mean = np.mean(x)
-    std = np.std(x)
-    if std == 0:
+def _safe_kurtosis(centered: np.ndarray, std: float) -> float:
+    if len(centered) < 4 or std == 0:
         return 0.0
-    return np.mean(((x - mean) / std) ** 4) - 3.0
+    return np.mean((centered / std) ** 4) - 3.0
 
 
 def _zero_crossing_rate(x: np.ndarray) -> float:
@@ -104,6 +126,192 @@ def _spectral_entropy(magnitudes: np.ndarray) -> float:
     return -np.sum(prob * np.log2(prob))
 
 
+def extract_batch_features(rssi_windows: np.ndarray, elapsed_windows: np.ndarray) -> dict:
+    """
+    Vectorised extract_window_features() over a stack of equal-length windows.
+
+    The per-window moments, difference/rate statistics, energy and
+    zero-crossing rate come from a parallel Numba kernel when Numba is
+    installed, and from axis=1 NumPy reductions otherwise.
+
+    Parameters
+    ----------
+    rssi_windows : 2-D array (n_windows, window_size) of RSSI (dBm) values
+    elapsed_windows : 2-D array (n_windows, window_size) of elapsed time (seconds)
+
+    Returns
+    -------
+    dict of feature name -> array with one value per window
+    """
+    n_windows, n = rssi_windows.shape
+    zeros = np.zeros(n_windows)
+
+    if HAS_NUMBA and n >= 2:
+        out = np.empty((n_windows, len(_KERNEL_COLUMNS)))
+        _window_stats_kernel(rssi_windows, elapsed_windows, out)
+        core = dict(zip(_KERNEL_COLUMNS, out.T))
+    else:
+        core = _window_stats_numpy(rssi_windows, elapsed_windows)
+
+    mean = core["rssi_mean"]
+    std = core["rssi_std"]
+    centered = rssi_windows - mean[:, None]
+    q25, median, q75 = np.percentile(rssi_windows, [25, 50, 75], axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = centered / std[:, None]
+    flat = std == 0
+    skewness = np.where(flat, 0.0, np.mean(z ** 3, axis=1)) if n >= 3 else zeros
+    kurtosis = np.where(flat, 0.0, np.mean(z ** 4, axis=1) - 3.0) if n >= 4 else zeros
+
+    features = {
+        "rssi_mean": mean,
+        "rssi_std": std,
+        "rssi_min": core["rssi_min"],
+        "rssi_max": core["rssi_max"],
+        "rssi_range": core["rssi_max"] - core["rssi_min"],
+        "rssi_median": median,
+        "rssi_iqr": q75 - q25,
+        "rssi_skewness": skewness,
+        "rssi_kurtosis": kurtosis,
+        "rssi_mean_abs_diff": core["rssi_mean_abs_diff"],
+        "rssi_rate_mean": core["rssi_rate_mean"],
+        "rssi_rate_std": core["rssi_rate_std"],
+        "rssi_rate_max": core["rssi_rate_max"],
+        "rssi_energy": core["rssi_energy"],
+        "rssi_zero_crossing_rate": core["rssi_zero_crossing_rate"],
+        "n_samples": np.full(n_windows, n),
+    }
+
+    if n >= 4:
+        fft_vals = np.abs(np.fft.rfft(centered, axis=1))[:, 1:]
+        features["fft_peak"] = np.max(fft_vals, axis=1)
+        features["fft_energy"] = np.sum(fft_vals ** 2, axis=1)
+        features["fft_entropy"] = _spectral_entropy_batch(fft_vals)
+    else:
+        features["fft_peak"] = zeros
+        features["fft_energy"] = zeros
+        features["fft_entropy"] = zeros
+
+    return features
+
+
+_KERNEL_COLUMNS = [
+    "rssi_mean", "rssi_std", "rssi_min", "rssi_max",
+    "rssi_mean_abs_diff", "rssi_rate_mean", "rssi_rate_std", "rssi_rate_max",
+    "rssi_energy", "rssi_zero_crossing_rate",
+]
+
+
+def _window_stats_numpy(rssi_windows: np.ndarray, elapsed_windows: np.ndarray) -> dict:
+    n_windows, n = rssi_windows.shape
+    zeros = np.zeros(n_windows)
+
+    mean = np.mean(rssi_windows, axis=1)
+    centered = rssi_windows - mean[:, None]
+    stats = {
+        "rssi_mean": mean,
+        "rssi_std": np.sqrt(np.mean(centered ** 2, axis=1)),
+        "rssi_min": np.min(rssi_windows, axis=1),
+        "rssi_max": np.max(rssi_windows, axis=1),
+        "rssi_energy": np.sum(rssi_windows ** 2, axis=1) / n,
+    }
+
+    if n < 2:
+        stats["rssi_mean_abs_diff"] = zeros
+        stats["rssi_rate_mean"] = zeros
+        stats["rssi_rate_std"] = zeros
+        stats["rssi_rate_max"] = zeros
+        stats["rssi_zero_crossing_rate"] = zeros
+        return stats
+
+    dt = np.diff(elapsed_windows, axis=1)
+    d_rssi = np.diff(rssi_windows, axis=1)
+    rates = d_rssi / np.where(dt > 0, dt, 1e-6)
+
+    signs = np.sign(centered)
+    signs[signs == 0] = 1
+    crossings = np.sum(np.abs(np.diff(signs, axis=1)) > 0, axis=1)
+
+    stats["rssi_mean_abs_diff"] = np.mean(np.abs(d_rssi), axis=1)
+    stats["rssi_rate_mean"] = np.mean(rates, axis=1)
+    stats["rssi_rate_std"] = np.std(rates, axis=1)
+    stats["rssi_rate_max"] = np.max(np.abs(rates), axis=1)
+    stats["rssi_zero_crossing_rate"] = crossings / (n - 1)
+    return stats
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _window_stats_kernel(rssi_windows, elapsed_windows, out):
+        """Fill out[i] with the _KERNEL_COLUMNS values of window i (n >= 2)."""
+        n_windows, n = rssi_windows.shape
+        for i in prange(n_windows):
+            x = rssi_windows[i]
+            t = elapsed_windows[i]
+
+            total = 0.0
+            total_sq = 0.0
+            lo = x[0]
+            hi = x[0]
+            for j in range(n):
+                v = x[j]
+                total += v
+                total_sq += v * v
+                lo = min(lo, v)
+                hi = max(hi, v)
+            mean = total / n
+
+            var = 0.0
+            crossings = 0
+            prev_sign = 1.0 if x[0] - mean >= 0 else -1.0
+            for j in range(n):
+                d = x[j] - mean
+                var += d * d
+                sign = 1.0 if d >= 0 else -1.0
+                if sign != prev_sign:
+                    crossings += 1
+                prev_sign = sign
+
+            abs_diff = 0.0
+            rate_total = 0.0
+            rate_max = 0.0
+            for j in range(1, n):
+                dt = t[j] - t[j - 1]
+                d_rssi = x[j] - x[j - 1]
+                rate = d_rssi / (dt if dt > 0 else 1e-6)
+                abs_diff += abs(d_rssi)
+                rate_total += rate
+                rate_max = max(rate_max, abs(rate))
+            rate_mean = rate_total / (n - 1)
+
+            rate_var = 0.0
+            for j in range(1, n):
+                dt = t[j] - t[j - 1]
+                rate = (x[j] - x[j - 1]) / (dt if dt > 0 else 1e-6)
+                rate_var += (rate - rate_mean) ** 2
+
+            out[i, 0] = mean
+            out[i, 1] = np.sqrt(var / n)
+            out[i, 2] = lo
+            out[i, 3] = hi
+            out[i, 4] = abs_diff / (n - 1)
+            out[i, 5] = rate_mean
+            out[i, 6] = np.sqrt(rate_var / (n - 1))
+            out[i, 7] = rate_max
+            out[i, 8] = total_sq / n
+            out[i, 9] = crossings / (n - 1)
+
+
+def _spectral_entropy_batch(magnitudes: np.ndarray) -> np.ndarray:
+    power = magnitudes ** 2
+    total = np.sum(power, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prob = power / total[:, None]
+        terms = np.where(prob > 0, prob * np.log2(prob), 0.0)
+    return np.where(total == 0, 0.0, -np.sum(terms, axis=1))
+
+
 def create_sliding_windows(
     df: pd.DataFrame,
     window_size: int = 5,
@@ -122,27 +330,27 @@ def create_sliding_windows(
     -------
     DataFrame where each row is a feature vector with its label
     """
-    rssi = df["rssi"].values
+    # Upcast the compact int8 RSSI column once, before windowing.
+    rssi = df["rssi"].to_numpy(dtype=np.float64)
     elapsed = df["elapsed_sec"].values
     label = df["label"].iloc[0]
     source_file = df["file"].iloc[0] if "file" in df.columns else "unknown"
 
-    feature_rows = []
     n = len(rssi)
+    if n < window_size:
+        return pd.DataFrame()
 
-    for start in range(0, n - window_size + 1, step_size):
-        end = start + window_size
-        window_rssi = rssi[start:end]
-        window_elapsed = elapsed[start:end]
+    # Strided views: one row per window, no per-window copies.
+    rssi_windows = sliding_window_view(rssi, window_size)[::step_size]
+    elapsed_windows = sliding_window_view(elapsed, window_size)[::step_size]
 
-        features = extract_window_features(window_rssi, window_elapsed)
-        features["label"] = label
-        features["source_file"] = source_file
-        features["window_start_idx"] = start
-        features["window_center_time"] = np.mean(window_elapsed)
-        feature_rows.append(features)
+    features = extract_batch_features(rssi_windows, elapsed_windows)
+    features["label"] = label
+    features["source_file"] = source_file
+    features["window_start_idx"] = np.arange(0, n - window_size + 1, step_size)
+    features["window_center_time"] = np.mean(elapsed_windows, axis=1)
 
-    return pd.DataFrame(feature_rows)
+    return pd.DataFrame(features)
 
 
 def build_feature_dataset(
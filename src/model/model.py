@@ -1,10 +1,12 @@
 """
 Machine learning models for Wi-Fi activity classification.
 
-Trains and evaluates Logistic Regression and Random Forest classifiers
-on sliding-window RSSI features.
+Trains and evaluates Logistic Regression, Random Forest and histogram
+Gradient Boosting classifiers on sliding-window RSSI features.
 """
 
+import os
+
 import numpy as np
 import pandas as pd
 import joblib
@@ -16,9 +18,10 @@ from sklearn.model_selection import (
     GroupKFold,
     LeaveOneGroupOut,
 )
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.metrics import (
     accuracy_score,
     classification_report,
@@ -26,6 +29,24 @@ from sklearn.metrics import (
     f1_score,
 )
 
+try:
+    import treelite
+    import tl2cgen
+except ImportError:  # compiled inference is optional
+    treelite = None
+    tl2cgen = None
+
+try:
+    import onnxruntime as ort
+except ImportError:  # ONNX Runtime inference is optional
+    ort = None
+
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:  # ONNX export is optional
+    convert_sklearn = None
+
 
 FEATURE_COLUMNS = [
     "rssi_mean", "rssi_std", "rssi_min", "rssi_max", "rssi_range",
@@ -37,6 +58,78 @@ FEATURE_COLUMNS = [
 
 LABEL_ORDER = ["empty", "idle", "moving"]
 
+# dtype the scaler and models are fitted on; inference must use the same
+# one, since rounding features differently shifts them across tree splits.
+FEATURE_DTYPE = np.float32
+
+COMPILED_MODEL_FILE = "model.so"
+COMPILABLE_MODELS = (RandomForestClassifier, HistGradientBoostingClassifier)
+ONNX_MODEL_FILE = "model.onnx"
+# skl2onnx's HistGradientBoosting converter emits boolean node attributes
+# that current onnx releases reject, so that model is served via Treelite.
+ONNX_MODELS = (LogisticRegression, RandomForestClassifier)
+
+
+class CompiledModel:
+    """
+    Tree ensemble compiled to a native shared library with Treelite.
+
+    Exposes the predict / predict_proba subset of the sklearn API so it
+    can stand in for the joblib estimator at inference time; each call is
+    a single C call instead of sklearn's per-tree dispatch.
+    """
+
+    def __init__(self, libpath: Path):
+        self.predictor = tl2cgen.Predictor(str(libpath), verbose=False)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # DMatrix does not keep a reference to any copy it makes of a
+        # non-contiguous input, so pass it a contiguous array held here.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = self.predictor.predict(tl2cgen.DMatrix(X))
+        return proba.reshape(len(X), -1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.argmax(self.predict_proba(X), axis=1)
+
+
+class OnnxModel:
+    """
+    Scaler + classifier pipeline exported to ONNX and run with ONNX Runtime.
+
+    Takes unscaled features, since scaling is part of the graph, and
+    exposes predict / predict_proba like CompiledModel. Single-row calls
+    (the live predictor's case) copy into a persistent input OrtValue, so
+    each run is one C call with no per-call input allocation.
+    """
+
+    def __init__(self, path: Path):
+        self.session = ort.InferenceSession(
+            str(path), providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_names = [o.name for o in self.session.get_outputs()]
+        self.row = ort.OrtValue.ortvalue_from_numpy(
+            np.zeros((1, model_input.shape[1]), dtype=np.float32)
+        )
+
+    def _run(self, X: np.ndarray):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape == tuple(self.row.shape()):
+            self.row.update_inplace(X)
+            outputs = self.session.run_with_ort_values(
+                self.output_names, {self.input_name: self.row}
+            )
+            return [o.numpy() for o in outputs]
+        return self.session.run(self.output_names, {self.input_name: X})
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._run(X)[1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._run(X)[0]
+
 
 def prepare_data(feature_df: pd.DataFrame):
     """
@@ -50,7 +143,8 @@ def prepare_data(feature_df: pd.DataFrame):
     label_encoder : fitted LabelEncoder
     scaler : fitted StandardScaler
     """
-    X = feature_df[FEATURE_COLUMNS].values.astype(np.float64)
+    # float32 is what the tree models evaluate on internally anyway.
+    X = feature_df[FEATURE_COLUMNS].values.astype(FEATURE_DTYPE)
     le = LabelEncoder()
     le.fit(LABEL_ORDER)
     y = le.transform(feature_df["label"].values)
@@ -97,6 +191,13 @@ def train_and_evaluate(
             random_state=42,
             n_jobs=-1,
         ),
+        "Gradient Boosting": HistGradientBoostingClassifier(
+            max_depth=6,
+            learning_rate=0.1,
+            max_iter=150,
+            class_weight="balanced",
+            random_state=42,
+        ),
     }
 
     if cv_mode == "group":
@@ -173,25 +274,138 @@ def save_model(output: dict, save_dir: str = "saved_model"):
     joblib.dump(output["scaler"], save_path / "scaler.joblib")
     joblib.dump(output["label_encoder"], save_path / "label_encoder.joblib")
     joblib.dump(output["feature_columns"], save_path / "feature_columns.joblib")
+    joblib.dump(np.dtype(FEATURE_DTYPE).name, save_path / "feature_dtype.joblib")
+    model = output["models"][best_name]
+    # load_model() serves model.onnx when it exists, so the slow Treelite
+    # build is only needed when the ONNX export is unavailable.
+    if export_onnx_model(
+        model, output["scaler"], save_path, len(output["feature_columns"])
+    ):
+        (save_path / COMPILED_MODEL_FILE).unlink(missing_ok=True)
+    else:
+        export_compiled_model(model, save_path)
 
     print(f"Model artifacts saved to {save_path}/")
     return save_path
 
 
+def export_compiled_model(model, save_path: Path) -> bool:
+    """
+    Compile a tree ensemble to a native library for low-latency inference.
+
+    Skipped when Treelite is not installed or the model is not a tree
+    ensemble, and with a warning if compilation fails. Any previously
+    compiled library is removed first so that load_model() never picks
+    up a stale model.
+    """
+    libpath = save_path / COMPILED_MODEL_FILE
+    if libpath.exists():
+        libpath.unlink()
+
+    if tl2cgen is None or not isinstance(model, COMPILABLE_MODELS):
+        return False
+
+    try:
+        tl_model = treelite.sklearn.import_model(model)
+        tl2cgen.export_lib(
+            tl_model,
+            toolchain="gcc",
+            libpath=str(libpath),
+            # One source file per core; a single file for a 200-tree forest
+            # takes gcc tens of minutes and gigabytes of memory.
+            params={"parallel_comp": os.cpu_count() or 1},
+        )
+    except Exception as e:
+        print(f"  [WARN] Model compilation skipped: {_describe_error(e)}")
+        return False
+
+    print(f"Compiled model saved to {libpath}")
+    return True
+
+
+def _describe_error(e: Exception, limit: int = 200) -> str:
+    """One-line, length-limited summary of an export failure."""
+    lines = str(e).strip().splitlines()
+    message = lines[0] if lines else ""
+    if len(message) > limit or len(lines) > 1:
+        message = message[:limit] + "..."
+    return f"{type(e).__name__}: {message}"
+
+
+def export_onnx_model(model, scaler, save_path: Path, n_features: int) -> bool:
+    """
+    Export scaler + classifier to ONNX as a single graph for ONNX Runtime.
+
+    Fusing the scaler means inference is one run() over one input buffer
+    with no separately scaled intermediate array. Skipped when skl2onnx is
+    not installed or the model is not in ONNX_MODELS, and with a warning
+    if conversion fails. Any previous export is removed first, as in
+    export_compiled_model().
+    """
+    onnx_path = save_path / ONNX_MODEL_FILE
+    if onnx_path.exists():
+        onnx_path.unlink()
+
+    if convert_sklearn is None or not isinstance(model, ONNX_MODELS):
+        return False
+
+    try:
+        onx = convert_sklearn(
+            Pipeline([("scaler", scaler), ("model", model)]),
+            initial_types=[("X", FloatTensorType([None, n_features]))],
+            options={id(model): {"zipmap": False}},
+        )
+    except Exception as e:
+        print(f"  [WARN] ONNX export skipped: {_describe_error(e)}")
+        return False
+
+    onnx_path.write_bytes(onx.SerializeToString())
+    print(f"ONNX model saved to {onnx_path}")
+    return True
+
+
 def load_model(save_dir: str = "saved_model"):
-    """Load a saved model for inference."""
+    """
+    Load a saved model for inference.
+
+    Prefers the ONNX export when ONNX Runtime is installed, then the
+    Treelite-compiled library, and falls back to the joblib estimator.
+    The ONNX graph includes feature scaling, so "scaler" is None then.
+    "feature_dtype" is the dtype the model was fitted on; artifacts saved
+    before it was recorded were fitted on float64.
+    """
     save_path = Path(save_dir)
+    onnx_path = save_path / ONNX_MODEL_FILE
+    libpath = save_path / COMPILED_MODEL_FILE
+    scaler = None
+    if ort is not None and onnx_path.exists():
+        model = OnnxModel(onnx_path)
+    else:
+        scaler = joblib.load(save_path / "scaler.joblib")
+        if tl2cgen is not None and libpath.exists():
+            model = CompiledModel(libpath)
+        else:
+            model = joblib.load(save_path / "model.joblib")
+
+    dtype_path = save_path / "feature_dtype.joblib"
+    feature_dtype = joblib.load(dtype_path) if dtype_path.exists() else "float64"
+
     return {
-        "model": joblib.load(save_path / "model.joblib"),
-        "scaler": joblib.load(save_path / "scaler.joblib"),
+        "model": model,
+        "scaler": scaler,
         "label_encoder": joblib.load(save_path / "label_encoder.joblib"),
         "feature_columns": joblib.load(save_path / "feature_columns.joblib"),
+        "feature_dtype": np.dtype(feature_dtype),
     }
 
 
 def predict_single_window(artifacts: dict, feature_dict: dict) -> str:
     """Run inference on a single feature vector."""
-    X = np.array([[feature_dict[col] for col in artifacts["feature_columns"]]])
-    X_scaled = artifacts["scaler"].transform(X)
-    y_pred = artifacts["model"].predict(X_scaled)
+    X = np.array(
+        [[feature_dict[col] for col in artifacts["feature_columns"]]],
+        dtype=artifacts["feature_dtype"],
+    )
+    if artifacts["scaler"] is not None:
+        X = artifacts["scaler"].transform(X)
+    y_pred = artifacts["model"].predict(X)
     return artifacts["label_encoder"].inverse_transform(y_pred)[0]
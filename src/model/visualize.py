@@ -11,6 +11,8 @@ import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 from pathlib import Path
 
 COLOR_MAP = {"empty": "#2196F3", "idle": "#FF9800", "moving": "#F44336"}
@@ -35,24 +37,46 @@ def plot_raw_rssi(full_df: pd.DataFrame, output_dir: str = "plots"):
 
     fig, axes = plt.subplots(2, 1, figsize=(14, 8))
 
+    # Split by label once instead of a full boolean-mask scan per label
+    # in each of the two panels.
+    by_label = {
+        label: group for label, group in full_df.groupby("label", observed=True)
+    }
+
+    # All file traces go into one LineCollection artist instead of one
+    # Line2D per file; legend entries are lightweight proxies.
+    segments = []
+    filenames = []
     for label in LABEL_ORDER:
-        subset = full_df[full_df["label"] == label]
+        subset = by_label.get(label)
+        if subset is None:
+            continue
         for filename, file_df in subset.groupby("file"):
-            axes[0].plot(
-                file_df["elapsed_sec"],
-                file_df["rssi"],
-                alpha=0.6,
-                label=f"{filename}",
-                linewidth=0.8,
-            )
+            segments.append(np.column_stack((
+                file_df["elapsed_sec"].to_numpy(),
+                file_df["rssi"].to_numpy(),
+            )))
+            filenames.append(filename)
+
+    colors = [f"C{i}" for i in range(len(segments))]
+    axes[0].add_collection(
+        LineCollection(segments, colors=colors, linewidths=0.8, alpha=0.6)
+    )
+    axes[0].autoscale_view()
 
     axes[0].set_xlabel("Elapsed Time (s)")
     axes[0].set_ylabel("RSSI (dBm)")
     axes[0].set_title("Raw RSSI Time-Series by File")
-    axes[0].legend(fontsize=7, ncol=3, loc="lower left")
+    axes[0].legend(
+        [Line2D([], [], color=c, alpha=0.6, linewidth=0.8) for c in colors],
+        filenames,
+        fontsize=7, ncol=3, loc="lower left",
+    )
 
     for label in LABEL_ORDER:
-        subset = full_df[full_df["label"] == label]
+        subset = by_label.get(label)
+        if subset is None:
+            continue
         axes[1].hist(
             subset["rssi"],
             bins=30,